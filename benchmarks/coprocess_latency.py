@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Per-request latency: one process per call versus one coprocess for all calls."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+SCRIPT = Path(__file__).resolve().parents[1] / "tts_plaintext_converter.py"
+
+SAMPLES = [
+    r"For \mathbf{u}, \mathbf{v} \in \mathbb{R}^n with \mathbf{v} \neq \mathbf{0}.",
+    r"$$\int_0^1 x^2 \, dx = \frac{1}{3}$$",
+    r"\sum_{i=1}^{n} i = \frac{n(n+1)}{2}",
+    r"\begin{bmatrix}1 & 2 \\ 3 & 4\end{bmatrix}",
+    "z = 2i + 5i.",
+]
+
+
+def spawn_per_call(texts: List[str]) -> List[float]:
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(SCRIPT), text], check=True, capture_output=True)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def coprocess(texts: List[str]) -> List[float]:
+    proc = subprocess.Popen(
+        [sys.executable, str(SCRIPT), "--serve", "lines", "--workers", "1"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    assert proc.stdin is not None and proc.stdout is not None
+    latencies = []
+    try:
+        for idx, text in enumerate(texts):
+            start = time.perf_counter()
+            proc.stdin.write(json.dumps({"id": idx, "text": text}).encode("utf-8") + b"\n")
+            proc.stdin.flush()
+            json.loads(proc.stdout.readline())
+            latencies.append(time.perf_counter() - start)
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return latencies
+
+
+def report(name: str, latencies: List[float]) -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{name:>16}: median {statistics.median(ordered) * 1000:8.2f} ms   p95 {p95 * 1000:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--requests", type=int, default=50)
+    args = parser.parse_args()
+    # Distinct texts so the coprocess cannot answer from its verbalization cache.
+    texts = [f"{SAMPLES[i % len(SAMPLES)]} k = {i}" for i in range(args.requests)]
+    report("spawn per call", spawn_per_call(texts))
+    report("coprocess", coprocess(texts))
+
+
+if __name__ == "__main__":
+    main()
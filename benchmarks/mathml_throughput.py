@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Throughput of the MathML front-end against the same equations written in TeX.
+
+Exits non-zero when the MathML path is slower or reads the equations differently.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import tts_plaintext_converter as converter  # noqa: E402
+
+# Each pair is one equation as an equation editor exports it and as TeX.
+PAIRS = [
+    (
+        "<mfrac><mrow><msup><mi>x</mi><mn>2</mn></msup><mo>+</mo><mn>1</mn></mrow>"
+        "<msqrt><msub><mi>y</mi><mi>i</mi></msub></msqrt></mfrac>",
+        r"\frac{x^2+1}{\sqrt{y_i}}",
+    ),
+    (
+        "<munderover><mo>∑</mo><mrow><mi>k</mi><mo>=</mo><mn>1</mn></mrow><mi>n</mi></munderover>"
+        "<msup><mi>k</mi><mn>3</mn></msup><mo>≤</mo><mroot><mi>n</mi><mn>3</mn></mroot>",
+        r"\sum_{k=1}^{n} k^3 \le \sqrt[3]{n}",
+    ),
+    (
+        "<msup><mi>A</mi><mi>T</mi></msup><mo>=</mo><mrow><mo>(</mo><mtable>"
+        "<mtr><mtd><mn>1</mn></mtd><mtd><mi>a</mi></mtd></mtr>"
+        "<mtr><mtd><mi>b</mi></mtd><mtd><mn>2</mn></mtd></mtr></mtable><mo>)</mo></mrow>",
+        r"A^T = \begin{pmatrix}1 & a\\ b & 2\end{pmatrix}",
+    ),
+]
+
+
+def documents(count: int) -> List[str]:
+    mathml = []
+    tex = []
+    for idx in range(count):
+        body_mathml, body_tex = PAIRS[idx % len(PAIRS)]
+        mathml.append(f"<p>Step {idx}: <math>{body_mathml}</math> holds.</p>\n")
+        tex.append(f"Step {idx}: ${body_tex}$ holds.\n")
+    return ["<html><body>" + "".join(mathml) + "</body></html>", "".join(tex)]
+
+
+def median_seconds(runs: int, source: str, input_format: str) -> float:
+    # Time the stages themselves: verbalize() would answer a small document
+    # from its cache after the first run.
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        converter._run_stages(source, input_format)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--equations", type=int, default=2000)
+    parser.add_argument("-r", "--runs", type=int, default=5)
+    args = parser.parse_args()
+    mathml, tex = documents(args.equations)
+    converter.warm()
+    if converter.convert_mathml(mathml) != converter.convert_math_and_text(tex):
+        print("MathML and TeX readings differ")
+        return 1
+    timings = {
+        "tex": median_seconds(args.runs, tex, "tex"),
+        "mathml": median_seconds(args.runs, mathml, "mathml"),
+    }
+    for name, seconds in timings.items():
+        print(f"{name:>7}: {args.equations / seconds:10.0f} equations/s")
+    return 1 if timings["mathml"] > timings["tex"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
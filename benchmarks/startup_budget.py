@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Cold-start cost: module import and first conversion in a fresh interpreter.
+
+Exits non-zero when the median of either measurement is over its budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import py_compile
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+SCRIPT = Path(__file__).resolve().parents[1] / "tts_plaintext_converter.py"
+
+PROBE = r"""
+import json, time
+start = time.perf_counter()
+import tts_plaintext_converter as converter
+imported = time.perf_counter()
+converter.convert_math_and_text(r"Let $\frac{x^2}{y_1} \le \sqrt{\alpha}$ and 2x + 3 = 7.")
+converted = time.perf_counter()
+print(json.dumps({"import": imported - start, "first_call": converted - imported}))
+"""
+
+
+def measure(runs: int) -> Dict[str, List[float]]:
+    # Deployments import from cached bytecode, so make sure it exists even
+    # when PYTHONDONTWRITEBYTECODE is set.
+    py_compile.compile(str(SCRIPT), doraise=True)
+    samples: Dict[str, List[float]] = {"import": [], "first_call": []}
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=SCRIPT.parent,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        for key, value in json.loads(result.stdout).items():
+            samples[key].append(value * 1000)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--runs", type=int, default=15)
+    parser.add_argument("--import-budget-ms", type=float, default=25.0)
+    parser.add_argument("--first-call-budget-ms", type=float, default=25.0)
+    args = parser.parse_args()
+    budgets = {"import": args.import_budget_ms, "first_call": args.first_call_budget_ms}
+    over = False
+    for key, values in measure(args.runs).items():
+        median = statistics.median(values)
+        status = "ok" if median <= budgets[key] else "OVER BUDGET"
+        over = over or median > budgets[key]
+        print(f"{key:>10}: median {median:7.2f} ms  (budget {budgets[key]:.0f} ms)  {status}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
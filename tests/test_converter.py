@@ -1,13 +1,24 @@
+import io
+import json
+import os
+import pickle
+import struct
 import subprocess
 import sys
 from pathlib import Path
 
+import pytest
+
 SCRIPT = Path(__file__).resolve().parents[1] / "tts_plaintext_converter.py"
+STARTUP_BENCHMARK = SCRIPT.parent / "benchmarks" / "startup_budget.py"
+sys.path.insert(0, str(SCRIPT.parent))
+
+import tts_plaintext_converter as converter  # noqa: E402
 
 
-def run_converter(text: str) -> str:
+def run_converter(text: str, *options: str) -> str:
     result = subprocess.run(
-        [sys.executable, str(SCRIPT), text],
+        [sys.executable, str(SCRIPT), *options, text],
         check=True,
         capture_output=True,
         text=True,
@@ -37,6 +48,12 @@ def test_norm_word():
     assert "absolute value" not in output
 
 
+def test_idiom_words_read_through_script_marks():
+    assert converter.convert_math_and_text("x^vec") == '"x" to the power vector'
+    assert converter.convert_math_and_text("d_xvec") == '"d" sub xvec'
+    assert converter.convert_math_and_text("x_norm y norm") == '"x" sub norm of "y"'
+
+
 def test_matrix_dimensions():
     output = run_converter("\\begin{bmatrix}1 & 2 \\ 3 & 4\\end{bmatrix}")
     assert "two rows" in output
@@ -54,3 +71,210 @@ def test_perpendicular_phrase():
     output = run_converter("\\operatorname{perp}_{\\mathbf{u}} \\mathbf{v}")
     assert "perpendicular of vector \"u\" onto vector \"v\"" in output
 
+
+def test_renderers_share_one_verbalization():
+    ir = converter.verbalize("$\\frac{x^2}{y} = \\sqrt{a}$")
+    assert converter.render(ir) == converter.convert_math_and_text("$\\frac{x^2}{y} = \\sqrt{a}$")
+    assert ir.text == '"x" squared over "y" equals square root of a'
+    assert ("fraction", False, 0) in list(ir.events())
+    spoken = converter.render(ir, "screen-reader")
+    assert spoken == "start fraction x squared over y end fraction equals square root of a end root"
+
+
+def test_verbalization_round_trips():
+    ir = converter.verbalize("\\begin{bmatrix}1 & x \\ 3 & 4\\end{bmatrix} + 2")
+    assert converter.Verbalization.from_json(ir.to_json()) == ir
+    assert pickle.loads(pickle.dumps(ir)) == ir
+
+
+def test_cached_verbalization_cannot_be_changed():
+    ir = converter.verbalize("x^2 + y_1")
+    with pytest.raises(AttributeError):
+        ir.text = "oops"
+    with pytest.raises(TypeError):
+        ir.offsets[0] = 7
+    assert converter.convert_math_and_text("x^2 + y_1") == '"x" squared plus "y" sub one'
+
+
+def test_ssml_format():
+    output = run_converter("\\frac{1}{x}", "--format", "ssml")
+    assert output.startswith("<speak>") and output.endswith("</speak>")
+    assert '<say-as interpret-as="characters">x</say-as>' in output
+
+
+def test_signed_script_numbers_stay_separate_words():
+    assert converter.convert_math_and_text("x^-1") == '"x" to the power minus one'
+    assert converter.convert_math_and_text("10^-3 m") == 'ten to the power minus three "m"'
+    ssml = converter.render(converter.verbalize("x_+2"), "ssml")
+    assert "sub plus</prosody> two" in ssml
+
+
+def test_digit_run_past_a_script_is_one_number():
+    assert converter.convert_math_and_text("x^10") == '"x" to the power ten'
+    assert converter.convert_math_and_text("a_12") == "a sub twelve"
+    assert converter.convert_math_and_text("2^10 = 1024") == (
+        "two to the power ten equals one thousand twenty four"
+    )
+    assert converter.convert_math_and_text("2¹⁰") == converter.convert_math_and_text("2^10")
+    ssml = converter.render(converter.verbalize("x^10"), "ssml")
+    assert "to the power ten</prosody>" in ssml
+
+
+def test_serve_lines_answers_each_request_by_id():
+    requests = [{"id": idx, "text": f"x^{idx}"} for idx in range(2, 6)] + [{"id": "bad"}]
+    stdin = io.BytesIO(b"".join(json.dumps(r).encode() + b"\n" for r in requests))
+    stdout = io.BytesIO()
+    converter.serve(stdin, stdout, "lines", workers=3)
+    responses = {r["id"]: r for r in map(json.loads, stdout.getvalue().splitlines())}
+    assert responses[2]["output"] == '"x" squared'
+    assert responses[5]["output"] == '"x" to the power five'
+    assert "error" in responses["bad"]
+
+
+def test_serve_length_prefixed_pipe():
+    payload = json.dumps({"id": 7, "text": "\\frac{1}{2}", "format": "screen-reader"}).encode()
+    result = subprocess.run(
+        [sys.executable, str(SCRIPT), "--serve", "length"],
+        input=struct.pack(">I", len(payload)) + payload,
+        check=True,
+        capture_output=True,
+    )
+    (size,) = struct.unpack(">I", result.stdout[:4])
+    assert json.loads(result.stdout[4 : 4 + size]) == {
+        "id": 7,
+        "output": "start fraction one over two end fraction",
+    }
+
+
+def test_import_leaves_heavy_modules_unloaded():
+    probe = (
+        "import sys, tts_plaintext_converter; "
+        "print(sorted({'json', 'threading', 'concurrent.futures', 'xml.etree.ElementTree'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=SCRIPT.parent, check=True, capture_output=True, text=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_warm_then_convert():
+    converter.warm()
+    assert converter._unicode_rules.cache_info().currsize == 1
+    assert converter.convert_math_and_text("\\alpha \\le \\beta") == "alpha less than or equal to beta"
+
+
+def test_startup_within_budget():
+    # Wall-clock budgets only mean something on a quiet machine, so shared CI
+    # runs the benchmark as a smoke test; set TTS_CONVERTER_TIMING=1 to enforce.
+    budgets = [] if os.environ.get("TTS_CONVERTER_TIMING") == "1" else [
+        "--import-budget-ms", "2000", "--first-call-budget-ms", "2000"
+    ]
+    result = subprocess.run(
+        [sys.executable, str(STARTUP_BENCHMARK), "--runs", "5", *budgets], capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stdout
+
+
+def test_warm_env_flag_only_accepts_truthy_values():
+    check = "import tts_plaintext_converter as c; print(c._unicode_rules.cache_info().currsize)"
+    for value, warmed in [("1", "1"), ("true", "1"), ("0", "0"), ("false", "0"), ("", "0")]:
+        result = subprocess.run(
+            [sys.executable, "-c", check],
+            cwd=SCRIPT.parent,
+            env={**os.environ, "TTS_CONVERTER_WARM": value},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.strip() == warmed, value
+
+
+def test_memory_report_stays_a_small_multiple_of_input():
+    paragraph = (
+        r"For $\mathbf{u}, \mathbf{v} \in \mathbb{R}^n$ the value $\frac{a+b}{c_1}$ appears 12 times, "
+        r"and \[\sum_{i=1}^{n} x_i^2\] is plain prose around a little math. "
+    )
+    source = paragraph * ((1 << 17) // len(paragraph))
+    report = converter.memory_report(source)
+    assert [stage["stage"] for stage in report["stages"]] == [
+        "prepare", "unicode", "inline math", "tex", "numbers", "letters", "cleanup", "structure"
+    ]
+    assert report["peak_ratio"] < 10
+
+    dense = r"x^2 + \frac{a}{b} - \sqrt{y_1} = 3x \le \alpha, "
+    report = converter.memory_report(dense * ((1 << 17) // len(dense)))
+    assert report["peak_ratio"] < 12
+
+
+def test_memory_report_flag():
+    result = subprocess.run(
+        [sys.executable, str(SCRIPT), "--memory-report", "$x^2$"], capture_output=True, text=True, check=True
+    )
+    assert result.stdout == '"x" squared\n'
+    assert json.loads(result.stderr)["stages"][-1]["stage"] == "structure"
+
+
+def test_memory_report_flag_runs_the_pipeline_once(monkeypatch, capsys):
+    def unmeasured(*args):
+        raise AssertionError("document converted outside the measured run")
+
+    monkeypatch.setattr(converter, "verbalize", unmeasured)
+    options, args = converter._parse_options(["--memory-report", "$x^3$"])
+    assert converter._cli_verbalization(options, args).text == '"x" cubed'
+    assert json.loads(capsys.readouterr().err)["stages"][-1]["stage"] == "structure"
+
+
+def test_mathml_reads_like_tex():
+    pairs = [
+        ("<mfrac><mi>x</mi><mn>2</mn></mfrac>", r"\frac{x}{2}"),
+        (
+            "<mroot><mi>x</mi><mn>3</mn></mroot><mo>≤</mo><msqrt><mi>α</mi></msqrt>",
+            r"\sqrt[3]{x} \le \sqrt{\alpha}",
+        ),
+        (
+            "<msubsup><mi>y</mi><mi>i</mi><mn>2</mn></msubsup><mo>−</mo><msup><mi>A</mi><mi>T</mi></msup>",
+            "y_i^2 - A^T",
+        ),
+        (
+            "<munderover><mo>∑</mo><mrow><mi>i</mi><mo>=</mo><mn>1</mn></mrow><mi>n</mi></munderover>"
+            "<mi>i</mi>",
+            r"\sum_{i=1}^{n} i",
+        ),
+        (
+            "<mtable><mtr><mtd><mn>1</mn></mtd><mtd><mn>0</mn></mtd></mtr></mtable>",
+            r"\begin{bmatrix}1 & 0\end{bmatrix}",
+        ),
+    ]
+    pairs.append(("<mi>𝐯</mi><mo>∈</mo><msup><mi>ℝ</mi><mn>²</mn></msup>", r"\mathbf{v} \in \mathbb{R}^2"))
+    for mathml, tex in pairs:
+        assert converter.convert_mathml(f"<math>{mathml}</math>") == converter.convert_math_and_text(f"${tex}$")
+
+
+def test_mathml_streams_document_with_prose():
+    paragraph = (
+        '<p>Here <math xmlns="http://www.w3.org/1998/Math/MathML"><msup><mi>x</mi><mn>2</mn></msup>'
+        "<mo>+</mo><mn>1</mn></math> is positive.</p>"
+    )
+    document = "<body>" + paragraph * 2000 + "</body>"
+    ir = converter.verbalize_mathml(io.BytesIO(document.encode("utf-8")))
+    assert ir.text.startswith('Here "x" squared plus one is positive. Here')
+    assert converter.memory_report(document, "mathml")["peak_ratio"] < 5
+
+
+def test_mathml_input_option():
+    assert run_converter("<math><msqrt><mi>x</mi></msqrt></math>", "--input", "mathml") == 'square root of "x"'
+    assert run_converter("<math><mo>&minus;</mo><mi>&alpha;</mi></math>", "--input", "mathml") == "minus alpha"
+    result = subprocess.run(
+        [sys.executable, str(SCRIPT), "--input", "mathml", "<math><mi>x"], capture_output=True, text=True
+    )
+    assert result.returncode == 1 and result.stderr.startswith("invalid MathML:")
+
+
+def test_unicode_math_reads_like_tex():
+    assert converter.convert_math_and_text("x² + a₁₂ ≤ 𝐯 ∈ ℝ and Aᵀ") == converter.convert_math_and_text(
+        r"x^{2} + a_{12} \le \mathbf{v} \in \mathbb{R} and A^T"
+    )
+    assert converter.convert_math_and_text("nº 5 and 1ª") == "n five and one"
+    assert converter.tex_to_words("𝐀𝐱 = λ𝐱 and \\|x\\| ≠ |y|") == (
+        "vector A vector x equals lambda vector x and norm of x not equal to absolute value bars y absolute value bars"
+    )
@@ -3,9 +3,130 @@
 
 from __future__ import annotations
 
+import os
 import re
 import sys
-from typing import Tuple
+from array import array
+from functools import lru_cache
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Sequence, TextIO, Tuple, Union
+
+# Importing this module should cost next to nothing: short-lived CLI and
+# serverless invocations pay for it on every call.  Modules only some paths
+# need (json, struct, threading, concurrent.futures, xml.etree, unicodedata)
+# are imported where they are used, and regular expressions are compiled on
+# first use -- inline patterns through the re cache, the command table
+# through _command_words().
+# Call warm() (or set TTS_CONVERTER_WARM=1) to pay that cost up front, e.g.
+# during a serverless init phase that gets snapshotted.
+
+# ------------------------- Verbalization structure marks ----------------------
+
+# While converting, every structural phrase is wrapped in a pair of marks taken
+# from the C1 control points U+0086-U+0095 (_MARK_BASE + kind * 2 opens, + 1
+# closes).  They ride along through the string passes and are lifted out into
+# a Verbalization at the very end.
+
+NODE_KINDS = (
+    "operator",
+    "number",
+    "letter",
+    "fraction",
+    "root",
+    "superscript",
+    "subscript",
+    "matrix",
+)
+(
+    _OPERATOR,
+    _NUMBER,
+    _LETTER,
+    _FRACTION,
+    _ROOT,
+    _SUPERSCRIPT,
+    _SUBSCRIPT,
+    _MATRIX,
+) = range(len(NODE_KINDS))
+
+# C1 control points: never whitespace or word characters, and still Latin-1,
+# so marking ASCII text does not double the width of every string after it.
+_MARK_BASE = 0x86
+_OPEN = [chr(_MARK_BASE + 2 * kind) for kind in range(len(NODE_KINDS))]
+_CLOSE = [chr(_MARK_BASE + 2 * kind + 1) for kind in range(len(NODE_KINDS))]
+_MARK_CLASS = "[" + _OPEN[0] + "-" + _CLOSE[-1] + "]"
+_NO_MARKS = {code: None for code in range(_MARK_BASE, _MARK_BASE + 2 * len(NODE_KINDS))}
+_BLANK_MARKS = {code: " " for code in _NO_MARKS}
+_PLAIN_MARKS = {**_NO_MARKS, ord(_OPEN[_LETTER]): '"', ord(_CLOSE[_LETTER]): '"'}
+
+
+# Word boundaries that look through marks, so a mark never splits a word.
+_WORD_START = rf"(?<!\w)(?<!\w{_MARK_CLASS})(?<!\w{_MARK_CLASS}{_MARK_CLASS})"
+_WORD_END = rf"(?!{_MARK_CLASS}*\w)"
+
+
+def _wrap(kind: int, phrase: str) -> str:
+    return _OPEN[kind] + phrase + _CLOSE[kind]
+
+
+def _marks_in(text: str) -> str:
+    return re.sub(rf"[^{_MARK_CLASS[1:-1]}]+", "", text)
+
+
+# Whole-document passes whose matches never reach past a word into the space
+# after it are applied piece by piece, cutting only where a word (not a
+# structure mark) meets a space, so re.sub's list of match pieces stays
+# bounded by the piece size rather than growing with the document.
+_CHUNK = 1 << 16
+
+
+def _by_chunks(fn: Callable[[str], str], text: str) -> str:
+    if len(text) <= _CHUNK:
+        return fn(text)
+    word_end = re.compile(rf"[^\s{_MARK_CLASS[1:-1]}](?= )")
+    pieces = []
+    start = 0
+    while len(text) - start > _CHUNK:
+        match = word_end.search(text, start + _CHUNK)
+        if not match:
+            break
+        pieces.append(fn(text[start : match.end()]))
+        start = match.end()
+    pieces.append(fn(text[start:]))
+    return "".join(pieces)
+
+
+def _bounded_sub(
+    pattern: str, repl: Callable[[re.Match[str]], str], text: str, flags: int = 0
+) -> str:
+    # re.sub for passes whose matches can span any distance: the pieces are
+    # joined every few thousand matches instead of all at the end.
+    done: List[str] = []
+    parts: List[str] = []
+    pos = 0
+    for match in re.finditer(pattern, text, flags):
+        parts.append(text[pos : match.start()])
+        parts.append(repl(match))
+        pos = match.end()
+        if len(parts) >= 4096:
+            done.append("".join(parts))
+            parts.clear()
+    parts.append(text[pos:])
+    done.append("".join(parts))
+    return "".join(done)
+
+
+def _squash_piece(text: str) -> str:
+    # Same result as re.sub(r"\s+", " ", text), but single spaces are not
+    # matches, so ordinary prose is not split into a piece per word.
+    return re.sub(r"\s\s+|[^\S ]", " ", text)
+
+
+def _squash(text: str) -> str:
+    return _by_chunks(_squash_piece, text)
+
+
+def _unmark(text: str) -> str:
+    return _squash(text.translate(_NO_MARKS)).strip()
+
 
 # ------------------------ Utilities: numbers to words ------------------------
 
@@ -80,36 +201,56 @@ _DIGIT_WORD = {
 
 
 def digits_to_words(text: str) -> str:
+    return _unmark(_by_chunks(_digits_to_words, text))
+
+
+def _digits_to_words(text: str) -> str:
+    # Marks are transparent here: digits are read the way the unmarked text
+    # would be.  A run glued to a letter through any number of marks is matched
+    # together with it and left alone; a run that carries on past marks (x^10
+    # closes the script after its first digit) is one number, followed by the
+    # marks it crossed in their original order.
+    def replace_number(match: re.Match[str]) -> str:
+        if match.group(1):
+            return match.group()
+        run = match.group(2)
+        digits = re.sub(r"\D", "", run)
+        return _wrap(_NUMBER, int_to_words(int(digits))) + re.sub(r"\d", "", run)
+
     text = re.sub(
-        r"(?<![A-Za-z0-9])\d+(?![A-Za-z0-9])",
-        lambda m: int_to_words(int(m.group())),
+        rf"([A-Za-z]{_MARK_CLASS}*)?(\d+(?:{_MARK_CLASS}+\d+)*)(?!{_MARK_CLASS}*[A-Za-z0-9])",
+        replace_number,
         text,
     )
 
     def replace_alnum(match: re.Match[str]) -> str:
         prefix = match.group(1)
-        digits = match.group(2)
-        suffix = match.group(3)
+        digits = match.group(3)
+        suffix = match.group(5)
         phrase = int_to_words(int(digits))
         result = []
         if prefix:
             result.append(prefix)
+            result.append(match.group(2))
             if prefix[-1].isalpha():
                 result.append(" ")
-        result.append(phrase)
+        result.append(_wrap(_NUMBER, phrase))
+        result.append(match.group(4))
         if suffix:
             result.append(" ")
             result.append(suffix)
         return "".join(result)
 
-    text = re.sub(r"([A-Za-z])?(\d+)([A-Za-z])", replace_alnum, text)
+    text = re.sub(
+        rf"(?:([A-Za-z])({_MARK_CLASS}*))?(\d+)({_MARK_CLASS}*)([A-Za-z])",
+        replace_alnum,
+        text,
+    )
 
     def replace_digit(match: re.Match[str]) -> str:
-        return " " + _DIGIT_WORD[match.group()] + " "
+        return " " + _wrap(_NUMBER, _DIGIT_WORD[match.group()]) + " "
 
-    text = re.sub(r"\d", replace_digit, text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    return re.sub(r"\d", replace_digit, text)
 
 
 # ---------------------------- Symbol dictionaries ---------------------------
@@ -248,6 +389,17 @@ TEX_SIMPLE = {
 }
 
 
+OPERATORS = {
+    "+": "plus",
+    "-": "minus",
+    "*": "times",
+    "/": "divided by",
+    "=": "equals",
+    "<": "less than",
+    ">": "greater than",
+}
+
+
 FUNCTIONS = {
     "sin": "sine of ",
     "cos": "cosine of ",
@@ -281,6 +433,108 @@ BLACKBOARD = {
 }
 
 
+@lru_cache(maxsize=None)
+def _command_words() -> Tuple[re.Pattern[str], Dict[str, str]]:
+    # One alternation over every simple command instead of a substitution
+    # per table entry; built on first use so that import stays cheap.
+    words = {k[1:]: v for k, v in TEX_SIMPLE.items()}
+    words.update((g, " " + w + " ") for g, w in GREEK.items())
+    words.update((g, " " + w + " ") for g, w in UPPER_GREEK.items())
+    names = sorted(words, key=len, reverse=True)
+    pattern = re.compile(r"\\(" + "|".join(map(re.escape, names)) + r")(?![A-Za-z])")
+    return pattern, words
+
+
+# --------------------------- Unicode normalization --------------------------
+
+# Copy-pasted math is full of Unicode: operator symbols, Greek letters,
+# superscript and subscript digits, and bold or double-struck letters from
+# the mathematical alphanumeric block.  Each document is scanned once and
+# every such character rewritten into the words or TeX the rest of the
+# pipeline already reads, so x² is spoken like x^{2} and 𝐯 like \mathbf{v}.
+
+
+@lru_cache(maxsize=None)
+def _greek_letters() -> Dict[str, str]:
+    import unicodedata
+
+    # Unicode spells lambda "LAMDA"; capitals read like their lowercase.
+    letters = {}
+    for code in range(0x391, 0x3CA):
+        name = unicodedata.name(chr(code), "").rpartition(" ")[2].lower()
+        name = name.replace("lamda", "lambda")
+        if name in GREEK:
+            letters[chr(code)] = " " + GREEK[name] + " "
+    return letters
+
+
+# Blocks holding superscript, subscript and styled-letter compatibility forms.
+_UNICODE_FORM_BLOCKS = (
+    (0x00A0, 0x0100),
+    (0x1D2C, 0x1D6B),
+    (0x2070, 0x20A0),
+    (0x2100, 0x2150),
+    (0x2C7C, 0x2C7D),
+    (0x1D400, 0x1D800),
+)
+# Decompose to superscript a and o, but are ordinals in prose (1ª, nº).
+_ORDINAL_INDICATORS = {"ª", "º"}
+
+
+@lru_cache(maxsize=None)
+def _unicode_rules() -> Tuple[Dict[int, str], re.Pattern[str], Dict[int, str], Dict[int, str]]:
+    import unicodedata
+
+    words = dict(UNICODE_SYMBOLS)
+    words.update(_greek_letters())
+    scripts: Dict[str, Dict[str, str]] = {"<super>": {}, "<sub>": {}}
+    for first, last in _UNICODE_FORM_BLOCKS:
+        for code in range(first, last):
+            char = chr(code)
+            if char in _ORDINAL_INDICATORS:
+                continue
+            form, _, target = unicodedata.decomposition(char).partition(" ")
+            if not target or " " in target:
+                continue
+            base = chr(int(target, 16)).replace("−", "-")
+            if form in scripts and base.isascii() and (base.isalnum() or base in "+-=()"):
+                scripts[form][char] = base
+            elif form == "<font>" and (base.isalnum() or base in words):
+                name = unicodedata.name(char)
+                spoken = words.get(base, base)
+                if "DOUBLE-STRUCK" in name and base.isalpha():
+                    words[char] = "\\mathbb{" + spoken + "}"
+                elif "BOLD" in name and not base.isdigit():
+                    # Spaced off so that a run like 𝐀𝐱 reads as two vectors.
+                    words[char] = " \\mathbf{" + spoken + "}"
+                else:
+                    words[char] = spoken
+    superscripts = re.escape("".join(scripts["<super>"]))
+    subscripts = re.escape("".join(scripts["<sub>"]))
+    return (
+        str.maketrans(words),
+        re.compile(f"([{superscripts}]+)|[{subscripts}]+"),
+        str.maketrans(scripts["<super>"]),
+        str.maketrans(scripts["<sub>"]),
+    )
+
+
+def _normalize_unicode(text: str) -> str:
+    # "\|" is a TeX norm, so it is read before a bare "|" becomes a symbol.
+    if "|" in text:
+        text = text.replace("\\|", " norm ")
+    elif text.isascii():
+        return text
+    symbols, script_runs, superscripts, subscripts = _unicode_rules()
+
+    def script_repl(match: re.Match[str]) -> str:
+        if match.group(1):
+            return "^{" + match.group(1).translate(superscripts) + "}"
+        return "_{" + match.group().translate(subscripts) + "}"
+
+    return _by_chunks(lambda piece: script_runs.sub(script_repl, piece.translate(symbols)), text)
+
+
 # -------------------------- Group extraction helpers ------------------------
 
 
@@ -326,7 +580,7 @@ def _read_group(s: str, i: int) -> Tuple[str, int]:
 def _process_frac(s: str, i: int) -> Tuple[str, int]:
     num, k = _read_group(s, i)
     den, j = _read_group(s, k)
-    return f"{tex_to_words(num)} over {tex_to_words(den)}", j
+    return _wrap(_FRACTION, f"{_verbalize_tex(num)} over {_verbalize_tex(den)}"), j
 
 
 def _process_sqrt(s: str, i: int) -> Tuple[str, int]:
@@ -346,8 +600,8 @@ def _process_sqrt(s: str, i: int) -> Tuple[str, int]:
             j += 1
     rad, j = _read_group(s, i)
     if idx:
-        return f"{tex_to_words(idx)} th root of {tex_to_words(rad)}", j
-    return f"square root of {tex_to_words(rad)}", j
+        return _wrap(_ROOT, f"{_verbalize_tex(idx)} th root of {_verbalize_tex(rad)}"), j
+    return _wrap(_ROOT, f"square root of {_verbalize_tex(rad)}"), j
 
 
 def _process_sum_or_prod(name: str, s: str, i: int) -> Tuple[str, int]:
@@ -359,17 +613,19 @@ def _process_sum_or_prod(name: str, s: str, i: int) -> Tuple[str, int]:
     if i < len(s) and s[i] == "^":
         upper, i = _read_group(s, i + 1)
     word = "sum" if name == "sum" else "product"
-    out = word
-    if lower or upper:
-        lo = tex_to_words(lower) if lower else ""
-        up = tex_to_words(upper) if upper else ""
-        if lower and upper:
-            out += f" from {lo} to {up}"
-        elif lower:
-            out += f" with lower limit {lo}"
-        elif upper:
-            out += f" with upper limit {up}"
-    return out, i
+    lo = _verbalize_tex(lower) if lower else ""
+    up = _verbalize_tex(upper) if upper else ""
+    return _with_limits(word, lo, up), i
+
+
+def _with_limits(word: str, lo: str, up: str) -> str:
+    if lo and up:
+        return f"{word} from {lo} to {up}"
+    if lo:
+        return f"{word} with lower limit {lo}"
+    if up:
+        return f"{word} with upper limit {up}"
+    return word
 
 
 def _process_integral(s: str, i: int) -> Tuple[str, int]:
@@ -380,23 +636,15 @@ def _process_integral(s: str, i: int) -> Tuple[str, int]:
     i = _skip_spaces(s, i)
     if i < len(s) and s[i] == "^":
         upper, i = _read_group(s, i + 1)
-    prefix = "integral"
-    if lower or upper:
-        lo = tex_to_words(lower) if lower else ""
-        up = tex_to_words(upper) if upper else ""
-        if lower and upper:
-            prefix = f"integral from {lo} to {up}"
-        elif lower:
-            prefix = f"integral with lower limit {lo}"
-        elif upper:
-            prefix = f"integral with upper limit {up}"
-    return prefix, i
+    lo = _verbalize_tex(lower) if lower else ""
+    up = _verbalize_tex(upper) if upper else ""
+    return _with_limits("integral", lo, up), i
 
 
 def _process_binom(s: str, i: int) -> Tuple[str, int]:
     a, k = _read_group(s, i)
     b, j = _read_group(s, k)
-    return f"binomial of {tex_to_words(a)} and {tex_to_words(b)}", j
+    return f"binomial of {_verbalize_tex(a)} and {_verbalize_tex(b)}", j
 
 
 def _process_lim(s: str, i: int) -> Tuple[str, int]:
@@ -405,7 +653,7 @@ def _process_lim(s: str, i: int) -> Tuple[str, int]:
     if i < len(s) and s[i] == "_":
         sub, i = _read_group(s, i + 1)
     if sub:
-        return f"limit as {tex_to_words(sub)} of", i
+        return f"limit as {_verbalize_tex(sub)} of", i
     return "limit of", i
 
 
@@ -416,7 +664,11 @@ def _process_matrix(env: str, body: str) -> str:
         raw_rows = [r for r in re.split(r"\\", body) if r.strip()]
         for raw in raw_rows:
             cols = [c.strip() for c in raw.split("&") if c.strip()]
-            rows.append(cols)
+            rows.append([_verbalize_tex(c) for c in cols])
+    return _matrix_phrase(rows)
+
+
+def _matrix_phrase(rows: List[List[str]]) -> str:
     m = len(rows)
     n = max((len(r) for r in rows), default=0)
     row_word = int_to_words(m)
@@ -424,11 +676,10 @@ def _process_matrix(env: str, body: str) -> str:
     row_label = "row" if m == 1 else "rows"
     col_label = "column" if n == 1 else "columns"
     parts = [f"matrix with {row_word} {row_label} and {col_word} {col_label}"]
-    for idx, r in enumerate(rows, start=1):
-        entries = [tex_to_words(c) for c in r]
+    for idx, entries in enumerate(rows, start=1):
         row_phrase = f"row {int_to_words(idx)} entries are " + ", ".join(entries)
         parts.append(row_phrase)
-    return ". ".join(parts)
+    return _wrap(_MATRIX, ". ".join(parts))
 
 
 def _process_projection(name: str, s: str, i: int) -> Tuple[str, int]:
@@ -438,8 +689,8 @@ def _process_projection(name: str, s: str, i: int) -> Tuple[str, int]:
         target, i = _read_group(s, i + 1)
     i = _skip_spaces(s, i)
     arg, i = _read_group(s, i)
-    subject = tex_to_words(arg) if arg else ""
-    onto = tex_to_words(target) if target else ""
+    subject = _verbalize_tex(arg) if arg else ""
+    onto = _verbalize_tex(target) if target else ""
     if name == "proj":
         if onto:
             return f"projection of {subject} onto {onto}", i
@@ -455,15 +706,40 @@ def _process_projection(name: str, s: str, i: int) -> Tuple[str, int]:
 
 
 def tex_to_words(s: str) -> str:
+    return _unmark(_verbalize_tex(_normalize_unicode(s)))
+
+
+def _superscript(raw: str, words: str) -> str:
+    if raw in ("\\top", "top", "T", "⊤"):
+        return " " + _wrap(_SUPERSCRIPT, "transposed")
+    if raw in ("2", "two"):
+        return " " + _wrap(_SUPERSCRIPT, "squared")
+    if raw in ("3", "three"):
+        return " " + _wrap(_SUPERSCRIPT, "cubed")
+    if _unmark(words) == "minus one":
+        return " " + _wrap(_SUPERSCRIPT, "inverse")
+    return " " + _wrap(_SUPERSCRIPT, "to the power " + words)
+
+
+def _subscript(words: str) -> str:
+    return " " + _wrap(_SUBSCRIPT, "sub " + words)
+
+
+# Text the walker copies through unchanged; runs of it are appended as one
+# slice rather than one character at a time.  A comma already followed by
+# whitespace reads the same as the ", " the walker would emit for it.  The
+# run is spelled without an alternation inside the repeat, which would make
+# sre keep backtracking state for every character.
+_PLAIN_CHAR = r"[^\\^_()\[\]{}+\-*/=<>,]"
+_PLAIN_RUN = rf"(?:{_PLAIN_CHAR}|,(?=\s)){_PLAIN_CHAR}*(?:,(?=\s){_PLAIN_CHAR}*)*"
+
+
+def _verbalize_tex(s: str) -> str:
     s = re.sub(r"([A-Za-z]+)\s*\*\s*(\{)", r"\1_\2", s)
     s = re.sub(r"([A-Za-z\}])\s*\*\s*([0-9A-Za-z])", r"\1_{\{\2\}}", s)
     s = re.sub(r"([A-Za-z]+)\s*\*\s*(\{)", r"\1_\2", s)
     s = re.sub(r"(min|max)\*\s*\{", r"\1_{", s)
 
-    s = s.replace(r"\|", " norm ")
-    for sym, word in UNICODE_SYMBOLS.items():
-        s = s.replace(sym, word)
-
     s = s.replace(r"\,", " ").replace(r"\;", " ").replace(r"\:", " ").replace(r"\!", " ")
 
     for k, v in BLACKBOARD.items():
@@ -508,26 +784,30 @@ def tex_to_words(s: str) -> str:
             return _process_matrix(env, body)
         if "cases" in env:
             items = [seg.strip() for seg in re.split(r"\\", body) if seg.strip()]
-            items_words = [tex_to_words(seg.replace("&", " when ")) for seg in items]
+            items_words = [_verbalize_tex(seg.replace("&", " when ")) for seg in items]
             return "cases " + ". ".join(items_words)
-        return tex_to_words(body)
+        return _verbalize_tex(body)
 
     s = re.sub(r"\\begin\{([a-zA-Z*]+)\}(.+?)\\end\{\1\}", env_repl, s, flags=re.DOTALL)
 
-    for k, v in TEX_SIMPLE.items():
-        name = k[1:] if k.startswith("\\") else k
-        s = re.sub(r"\\" + re.escape(name) + r"(?![A-Za-z])", v, s)
-
-    for g in sorted(GREEK.keys(), key=len, reverse=True):
-        s = re.sub(r"\\" + re.escape(g) + r"(?![A-Za-z])", " " + GREEK[g] + " ", s)
-    for g in sorted(UPPER_GREEK.keys(), key=len, reverse=True):
-        s = re.sub(r"\\" + re.escape(g) + r"(?![A-Za-z])", " " + UPPER_GREEK[g] + " ", s)
+    pattern, words = _command_words()
+    s = _by_chunks(lambda piece: pattern.sub(lambda m: words[m.group(1)], piece), s)
 
     s = s.replace(r"\left", " ").replace(r"\right", " ")
 
+    plain_run = re.compile(_PLAIN_RUN)
+    done = []
     out = []
     i = 0
     while i < len(s):
+        if len(out) >= 4096:
+            done.append("".join(out))
+            out.clear()
+        run = plain_run.match(s, i)
+        if run:
+            out.append(run.group())
+            i = run.end()
+            continue
         ch = s[i]
         if ch == "\\":
             j = i + 1
@@ -561,15 +841,15 @@ def tex_to_words(s: str) -> str:
                 continue
             if cmd in ("mathbf", "boldsymbol", "bm", "vec"):
                 arg, i = _read_group(s, i)
-                out.append("vector " + tex_to_words(arg))
+                out.append("vector " + _verbalize_tex(arg))
                 continue
             if cmd in ("overline", "bar"):
                 arg, i = _read_group(s, i)
-                out.append("conjugate of " + tex_to_words(arg))
+                out.append("conjugate of " + _verbalize_tex(arg))
                 continue
             if cmd in ("hat", "widehat"):
                 arg, i = _read_group(s, i)
-                out.append("hat " + tex_to_words(arg))
+                out.append("hat " + _verbalize_tex(arg))
                 continue
             if cmd == "proj":
                 phrase, i = _process_projection("proj", s, i)
@@ -586,59 +866,23 @@ def tex_to_words(s: str) -> str:
             if cmd in ("dot", "ddot"):
                 arg, i = _read_group(s, i)
                 descriptor = "time derivative of " if cmd == "dot" else "second time derivative of "
-                out.append(descriptor + tex_to_words(arg))
+                out.append(descriptor + _verbalize_tex(arg))
                 continue
             continue
         if ch == "^":
             content, i = _read_group(s, i + 1)
-            raw = content.strip()
-            words = tex_to_words(content).strip()
-            if raw in ("\\top", "top", "T"):
-                out.append(" transposed")
-            elif raw in ("2", "two"):
-                out.append(" squared")
-            elif raw in ("3", "three"):
-                out.append(" cubed")
-            elif words.strip() == "minus one":
-                out.append(" inverse")
-            else:
-                out.append(" to the power " + words)
+            out.append(_superscript(content.strip(), _verbalize_tex(content).strip()))
             continue
         if ch == "_":
             content, i = _read_group(s, i + 1)
-            words = tex_to_words(content)
-            out.append(" sub " + words)
+            out.append(_subscript(_verbalize_tex(content)))
             continue
         if ch in "()[]{}":
             out.append(" ")
             i += 1
             continue
-        if ch == "+":
-            out.append(" plus ")
-            i += 1
-            continue
-        if ch == "-":
-            out.append(" minus ")
-            i += 1
-            continue
-        if ch == "*":
-            out.append(" times ")
-            i += 1
-            continue
-        if ch == "/":
-            out.append(" divided by ")
-            i += 1
-            continue
-        if ch == "=":
-            out.append(" equals ")
-            i += 1
-            continue
-        if ch == "<":
-            out.append(" less than ")
-            i += 1
-            continue
-        if ch == ">":
-            out.append(" greater than ")
+        if ch in OPERATORS:
+            out.append(" " + _wrap(_OPERATOR, OPERATORS[ch]) + " ")
             i += 1
             continue
         if ch == ",":
@@ -652,77 +896,813 @@ def tex_to_words(s: str) -> str:
         out.append(ch)
         i += 1
 
-    text = "".join(out)
+    done.append("".join(out))
+    del out, s
+    text = "".join(done)
+    del done
+
+    return _squash(_spoken_idioms(text)).strip()
+
 
-    text = re.sub(r"\bd\s*([A-Za-z])\b", lambda m: "with respect to " + m.group(1), text)
+def _spoken_idioms(text: str) -> str:
     text = re.sub(
-        r"\bpartial\s*([A-Za-z])\b",
+        _WORD_START + rf"d\s*({_MARK_CLASS}*[A-Za-z])" + _WORD_END,
+        lambda m: "with respect to " + m.group(1),
+        text,
+    )
+    text = re.sub(
+        _WORD_START + rf"partial\s*({_MARK_CLASS}*[A-Za-z])" + _WORD_END,
         lambda m: "partial with respect to " + m.group(1),
         text,
     )
 
-    text = text.replace(" to the power minus one", " inverse")
-    text = re.sub(r"angle\s+(.+?)\s*,\s*(.+?)\s+angle", r"inner product of \1 and \2", text)
-    text = re.sub(r"\bvec\b", "vector", text, flags=re.IGNORECASE)
-    text = re.sub(r"\bnorm\s+([^\.,]+?)\s+norm\b", r"norm of \1", text)
-    text = re.sub(r"\s+", " ", text).strip()
+    text = re.sub(
+        rf"(?<= )({_OPEN[_SUPERSCRIPT]}?)to the power {_OPEN[_OPERATOR]}?minus{_CLOSE[_OPERATOR]}? one",
+        r"\1inverse",
+        text,
+    )
+    # A script can close inside one of these words (x^vec marks only the v),
+    # so they are spelled through marks, which follow the phrase they become.
+    angle, vec, norm = ("(" + f"{_MARK_CLASS}*".join(word) + ")" for word in ("angle", "vec", "norm"))
+    text = re.sub(
+        _WORD_START + rf"{angle}\s+(.+?)\s*,\s*(.+?)\s+{angle}" + _WORD_END,
+        lambda m: f"inner product of{_marks_in(m.group(1))} {m.group(2)} and {m.group(3)}{_marks_in(m.group(4))}",
+        text,
+    )
+    text = re.sub(
+        _WORD_START + vec + _WORD_END, lambda m: "vector" + _marks_in(m.group(1)), text, flags=re.IGNORECASE
+    )
+    text = re.sub(
+        _WORD_START + rf"{norm}\s+([^\.,]+?)\s+{norm}" + _WORD_END,
+        lambda m: f"norm{_marks_in(m.group(1))} of {m.group(2)}{_marks_in(m.group(3))}",
+        text,
+    )
     return text
 
 
+# ----------------------------- MathML front-end -----------------------------
+
+# MathML is parsed incrementally, the way iterparse does it: expat is fed the
+# document in bounded pieces and builds elements through ElementTree's
+# TreeBuilder.  Every element is verbalized as soon as it closes and is then
+# detached from the tree, so memory follows the nesting depth rather than the
+# document size.  Layout elements map onto the phrases their TeX counterparts
+# produce; text outside <math> is read as prose, like text outside dollar
+# signs.
+
+_MathMLNode = Tuple[str, str, Tuple[str, ...]]  # phrase, token text, table cells
+
+_MATHML_TOKENS = {"mi", "mn", "mo", "mtext", "ms"}
+_MATHML_SKIPPED = {"annotation", "annotation-xml", "mphantom", "none", "mprescripts"}
+_MATHML_LOWER = {"msub", "munder", "msubsup", "munderover"}
+_MATHML_UPPER = {"msup": 1, "mover": 1, "msubsup": 2, "munderover": 2}
+_MATHML_FENCES = {"(", ")", "[", "]", "{", "}"}
+_MATHML_ALIASES = {"−": "-", "∗": "*", "∕": "/"}
+# Function application, invisible times, invisible separator, invisible plus.
+_INVISIBLE_OPERATORS = {"\u2061", "\u2062", "\u2063", "\u2064"}
+_LARGE_OPERATORS = {"∑": "sum", "∏": "product", "∫": "integral"}
+_ACCENTS = {
+    "¯": "conjugate of ",
+    "‾": "conjugate of ",
+    "^": "hat ",
+    "ˆ": "hat ",
+    "→": "vector ",
+    "\u20d7": "vector ",
+    "˙": "time derivative of ",
+    "¨": "second time derivative of ",
+}
+
+
+def _mathml_token(tag: str, text: str, variant: str) -> str:
+    if tag == "mo":
+        text = _MATHML_ALIASES.get(text, text)
+        if not text or text in _INVISIBLE_OPERATORS:
+            return ""
+        if text in OPERATORS:
+            return " " + _wrap(_OPERATOR, OPERATORS[text]) + " "
+        if text in _MATHML_FENCES:
+            return " "
+        if text == ",":
+            return ", "
+    elif tag == "mi" and text.isascii():
+        if variant == "double-struck":
+            return BLACKBOARD.get("\\mathbb{" + text + "}", text)
+        if variant.startswith("bold"):
+            return "vector " + text
+    # Unicode symbols, Greek, styled letters and script digits read as they
+    # do in TeX input; the few that normalize to TeX go through the walker.
+    spoken = _normalize_unicode(text)
+    if spoken != text and re.search(r"[\\^_]", spoken):
+        return _verbalize_tex(spoken)
+    return spoken
+
+
+def _mathml_scripts(tag: str, children: List[_MathMLNode]) -> str:
+    base, base_raw, _ = children[0]
+    lower = children[1] if tag in _MATHML_LOWER and len(children) > 1 else None
+    upper_at = _MATHML_UPPER.get(tag, 0)
+    upper = children[upper_at] if upper_at and len(children) > upper_at else None
+    lo = lower[0].strip() if lower else ""
+    up = upper[0].strip() if upper else ""
+    if base_raw in _LARGE_OPERATORS:
+        return _with_limits(_LARGE_OPERATORS[base_raw], lo, up) + " "
+    if base_raw == "lim":
+        return f"limit as {lo} of " if lo else "limit of "
+    if tag == "mover" and upper and upper[1] in _ACCENTS:
+        return _ACCENTS[upper[1]] + base
+    phrase = base
+    if lower:
+        phrase += _subscript(lo)
+    if upper:
+        phrase += _superscript(upper[1], up)
+    return phrase
+
+
+def _mathml_node(tag: str, elem: Any, children: List[_MathMLNode]) -> _MathMLNode:
+    if tag in _MATHML_TOKENS:
+        raw = (elem.text or "").strip().translate(_BLANK_MARKS)
+        phrase = _mathml_token(tag, raw, elem.get("mathvariant", ""))
+        if not raw.isascii():
+            # The layout already says where a script is, so <mn>²</mn> as a
+            # superscript counts as a plain 2.
+            _, _, superscripts, subscripts = _unicode_rules()
+            raw = raw.translate(superscripts).translate(subscripts)
+        return phrase, raw, ()
+    if tag in _MATHML_SKIPPED:
+        return "", "", ()
+    phrases = [phrase for phrase, _, _ in children]
+    if tag == "mfrac" and len(children) == 2:
+        return _wrap(_FRACTION, f"{phrases[0]} over {phrases[1]}"), "", ()
+    if tag == "msqrt":
+        return _wrap(_ROOT, "square root of " + " ".join(phrases)), "", ()
+    if tag == "mroot" and len(children) == 2:
+        return _wrap(_ROOT, f"{phrases[1]} th root of {phrases[0]}"), "", ()
+    if (tag in _MATHML_LOWER or tag in _MATHML_UPPER) and children:
+        return _mathml_scripts(tag, children), "", ()
+    if tag in ("mtr", "mlabeledtr"):
+        cells = [phrase.strip() for phrase in phrases[tag == "mlabeledtr" :]]
+        return "", "", tuple(cell for cell in cells if cell)
+    if tag == "mtable":
+        return _matrix_phrase([list(cells) for _, _, cells in children if cells]), "", ()
+    if tag == "semantics" and children:
+        return children[0]
+    if tag == "mfenced":
+        return " " + ", ".join(phrases) + " ", "", ()
+    spoken = [node for node in children if node[0].strip()]
+    if len(spoken) == 1:
+        return spoken[0]
+    return " ".join(phrases), "", ()
+
+
+# Every element in a fed piece waits in the parser's event queue until it is
+# read, so pieces are kept small; 16 KiB is also what iterparse reads.
+_MATHML_CHUNK = 1 << 14
+
+
+@lru_cache(maxsize=None)
+def _named_entities() -> Dict[str, str]:
+    from html.entities import html5
+
+    return {name[:-1]: text for name, text in html5.items() if name.endswith(";")}
+
+
+def _mathml_events(source: Union[str, BinaryIO, TextIO]) -> Iterator[Tuple[str, Any]]:
+    from xml.etree.ElementTree import ParseError, TreeBuilder
+    from xml.parsers import expat
+
+    builder = TreeBuilder()
+    events: List[Tuple[str, Any]] = []
+    parser = expat.ParserCreate(namespace_separator="}")
+    parser.buffer_text = True
+    parser.StartElementHandler = lambda tag, attrib: events.append(("start", builder.start(tag, attrib)))
+    parser.EndElementHandler = lambda tag: events.append(("end", builder.end(tag)))
+    parser.CharacterDataHandler = builder.data
+    # Equation editors export named entities such as &minus; without
+    # declaring them.  Assuming an unread DTD makes expat pass them on here
+    # instead of rejecting the document.
+    parser.UseForeignDTD(True)
+    parser.SkippedEntityHandler = lambda name, is_parameter: builder.data(
+        _named_entities().get(name, "")
+    )
+    if isinstance(source, str):
+        pieces: Iterator[Union[str, bytes]] = (
+            source[start : start + _MATHML_CHUNK] for start in range(0, len(source), _MATHML_CHUNK)
+        )
+    else:
+        empty = source.read(0)
+        pieces = iter(lambda: source.read(_MATHML_CHUNK), empty)
+    try:
+        for piece in pieces:
+            parser.Parse(piece, False)
+            yield from events
+            events.clear()
+        parser.Parse(b"", True)
+    except expat.ExpatError as exc:
+        raise ParseError(str(exc)) from None
+    yield from events
+
+
+def _verbalize_mathml(source: Union[str, BinaryIO, TextIO]) -> str:
+    done = []
+    out: List[str] = []
+    open_elements = []
+    math: List[List[_MathMLNode]] = []  # children of each open MathML element
+    last = None
+    last_part = "text"
+    for event, elem in _mathml_events(source):
+        # Text and tails are only complete once the parser has moved past them.
+        if last is not None and not math:
+            prose = getattr(last, last_part)
+            if prose and not prose.isspace():
+                out.append(" " + _verbalize_tex(_inline_math(_normalize_unicode(_prepare(prose)))) + " ")
+        if len(out) >= 4096:
+            done.append("".join(out))
+            out.clear()
+        tag = elem.tag.rpartition("}")[2]
+        last = elem
+        if event == "start":
+            last_part = "text"
+            open_elements.append(elem)
+            if math or tag == "math":
+                math.append([])
+            continue
+        last_part = "tail"
+        open_elements.pop()
+        if open_elements:
+            open_elements[-1].remove(elem)
+        if math:
+            node = _mathml_node(tag, elem, math.pop())
+            if math:
+                math[-1].append(node)
+            else:
+                # Commas come out of <mo> as their own token; attach them to
+                # the word before, as they are written in TeX.
+                out.append(" " + _spoken_idioms(re.sub(" +,", ",", node[0])) + " ")
+    done.append("".join(out))
+    return "".join(done)
+
+
 # ----------------------------- Expression pass ------------------------------
 
 
-def convert_math_and_text(source: str) -> str:
-    s = source
+_LETTER_TOKEN = rf"(?<![^ ])({_MARK_CLASS}*)([A-Za-z])({_MARK_CLASS}*)(?![^ ])"
+_UNSPOKEN = r'[^A-Za-z\.\,\"\s' + _MARK_CLASS[1:-1] + "]"
+
+
+# The expression pass is a fixed pipeline of whole-text stages.  Each stage
+# consumes the previous stage's text, but the marked text and each stage's
+# working copies keep the peak a multiple of the input: memory_report(),
+# which instruments the same list, measures about 6x for prose with some math
+# and 10.5x for dense math, mostly in the tex and structure stages.
+
+
+def _prepare(source: str) -> str:
+    s = source.translate(_BLANK_MARKS)
     s = re.sub(r"\\operatorname\s*\{([^{}]*)\}", lambda m: "\\" + m.group(1), s)
     s = re.sub(r"([A-Za-z]+)\s*\*\s*(\{)", r"\1_\2", s)
     s = re.sub(r"([A-Za-z\}])\s*\*\s*([0-9A-Za-z])", r"\1_{\{\2\}}", s)
     s = re.sub(r"([A-Za-z]+)\s*\*\s*(\{)", r"\1_\2", s)
     s = re.sub(r"(min|max)\*\s*\{", r"\1_{", s)
     s = re.sub(r"(\d)\s*!\s*:\s*!\s*([A-Za-z0-9])", r"\1 to \2", s)
+    return s
 
+
+def _inline_math(s: str) -> str:
     def dollar_repl(m: re.Match[str]) -> str:
-        return " " + tex_to_words(m.group(1)) + " "
+        return " " + _verbalize_tex(m.group(1)) + " "
 
-    s = re.sub(r"\$\$(.+?)\$\$", dollar_repl, s, flags=re.DOTALL)
-    s = re.sub(r"\$(.+?)\$", dollar_repl, s, flags=re.DOTALL)
-    s = re.sub(r"\\\((.+?)\\\)", dollar_repl, s, flags=re.DOTALL)
-    s = re.sub(r"\\\[(.+?)\\\]", dollar_repl, s, flags=re.DOTALL)
+    s = _bounded_sub(r"\$\$(.+?)\$\$", dollar_repl, s, flags=re.DOTALL)
+    s = _bounded_sub(r"\$(.+?)\$", dollar_repl, s, flags=re.DOTALL)
+    s = _bounded_sub(r"\\\((.+?)\\\)", dollar_repl, s, flags=re.DOTALL)
+    s = _bounded_sub(r"\\\[(.+?)\\\]", dollar_repl, s, flags=re.DOTALL)
+    return s
 
-    text = tex_to_words(s)
-    text = digits_to_words(text)
 
-    tokens = text.split(" ")
+def _quote_letters(text: str) -> str:
     allowed_letters = {"a", "i", "j"}.union(GREEK.values())
     special_letters = {"R"}
-    for idx, tok in enumerate(tokens):
-        if re.fullmatch(r"[A-Za-z]", tok):
-            if tok in special_letters:
+
+    def letter_repl(match: re.Match[str]) -> str:
+        letter = match.group(2)
+        if letter in special_letters or letter.lower() in allowed_letters:
+            return match.group()
+        return match.group(1) + _wrap(_LETTER, letter.lower()) + match.group(3)
+
+    return _by_chunks(lambda piece: re.sub(_LETTER_TOKEN, letter_repl, piece), text)
+
+
+def _numbers(text: str) -> str:
+    return _by_chunks(_digits_to_words, text)
+
+
+def _cleanup(text: str) -> str:
+    text = _by_chunks(lambda piece: re.sub(_UNSPOKEN, " ", piece), text)
+    return _squash(text).strip()
+
+
+_SPOKEN_STAGES = (
+    ("numbers", _numbers),
+    ("letters", _quote_letters),
+    ("cleanup", _cleanup),
+)
+_STAGES = (
+    ("prepare", _prepare),
+    ("unicode", _normalize_unicode),
+    ("inline math", _inline_math),
+    ("tex", _verbalize_tex),
+) + _SPOKEN_STAGES
+_PIPELINES = {
+    "tex": _STAGES,
+    "mathml": (("mathml", _verbalize_mathml),) + _SPOKEN_STAGES,
+}
+INPUT_FORMATS = tuple(_PIPELINES)
+
+
+def _run_stages(source: Union[str, BinaryIO, TextIO], input_format: str = "tex") -> Verbalization:
+    text = source
+    for _, stage in _PIPELINES[input_format]:
+        text = stage(text)
+    return Verbalization.from_marked(text)
+
+
+# Small inputs are cached; large documents are not kept alive after use.
+_CACHE_LIMIT = 1 << 16
+
+
+def verbalize(source: str, input_format: str = "tex") -> Verbalization:
+    if input_format not in _PIPELINES:
+        raise ValueError(f"unknown input format: {input_format}")
+    if len(source) > _CACHE_LIMIT:
+        return _run_stages(source, input_format)
+    return _cached_verbalize(source, input_format)
+
+
+@lru_cache(maxsize=256)
+def _cached_verbalize(source: str, input_format: str) -> Verbalization:
+    return _run_stages(source, input_format)
+
+
+def convert_math_and_text(source: str) -> str:
+    return verbalize(source).text
+
+
+def verbalize_mathml(source: Union[str, BinaryIO, TextIO]) -> Verbalization:
+    if isinstance(source, str):
+        return verbalize(source, "mathml")
+    return _run_stages(source, "mathml")
+
+
+def convert_mathml(source: Union[str, BinaryIO, TextIO]) -> str:
+    return verbalize_mathml(source).text
+
+
+def memory_report(source: str, input_format: str = "tex") -> Dict[str, object]:
+    return _measured_verbalize(source, input_format)[1]
+
+
+def _measured_verbalize(source: str, input_format: str) -> Tuple[Verbalization, Dict[str, object]]:
+    import tracemalloc
+
+    if input_format not in _PIPELINES:
+        raise ValueError(f"unknown input format: {input_format}")
+
+    # Compiled patterns and lookup tables are one-time costs, not per-document.
+    warm()
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stages = []
+        overall = 0
+        base, _ = tracemalloc.get_traced_memory()
+        text: object = source
+        for name, stage in _PIPELINES[input_format] + (("structure", Verbalization.from_marked),):
+            before_snapshot = tracemalloc.take_snapshot().filter_traces(ignore)
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            text = stage(text)  # type: ignore[arg-type]
+            after, peak = tracemalloc.get_traced_memory()
+            after_snapshot = tracemalloc.take_snapshot().filter_traces(ignore)
+            # Net change in live blocks: temporaries a stage frees again are not
+            # counted here, only in its peak_bytes.
+            blocks = sum(stat.count_diff for stat in after_snapshot.compare_to(before_snapshot, "filename"))
+            del before_snapshot, after_snapshot
+            overall = max(overall, peak - base)
+            stages.append(
+                {
+                    "stage": name,
+                    "peak_bytes": peak - before,
+                    "retained_bytes": after - before,
+                    "retained_blocks": blocks,
+                }
+            )
+    finally:
+        if started:
+            tracemalloc.stop()
+    input_bytes = sys.getsizeof(source)
+    return text, {  # type: ignore[return-value]
+        "input_bytes": input_bytes,
+        "peak_bytes": overall,
+        "peak_ratio": round(overall / input_bytes, 2),
+        "stages": stages,
+    }
+
+
+_WARM_SAMPLE = (
+    r"Let $\frac{x^2}{y_1} \le \sqrt{\alpha}$ and \begin{pmatrix}1 & 0\\ 0 & 1\end{pmatrix}"
+    r" with \begin{cases}1 & x > 0\end{cases}, x2y."
+)
+_WARM_MATHML = "<math><msup><mi>α</mi><mn>2</mn></msup><mo>≤</mo><mn>1</mn></math>"
+
+
+def warm() -> None:
+    _command_words()
+    _unicode_rules()
+    _named_entities()
+    _run_stages(_WARM_SAMPLE)
+    _run_stages(_WARM_MATHML, "mathml")
+
+
+# ------------------------- Verbalization and renderers ----------------------
+
+
+class Verbalization:
+    """Plain verbalization of a document plus its structure boundaries.
+
+    ``text`` is the plain rendering.  Each entry of ``codes`` is a node kind
+    times two (plus one for a closing boundary) and the matching entry of
+    ``offsets`` is where that boundary falls in ``text``.
+
+    Instances are immutable, since verbalize() hands the same cached object
+    to every caller; ``offsets`` is a read-only view of an ``array("I")``.
+    """
+
+    __slots__ = ("text", "codes", "offsets")
+
+    def __init__(self, text: str, codes: bytes = b"", offsets: Sequence[int] = ()) -> None:
+        if not (isinstance(offsets, array) and offsets.typecode == "I"):
+            offsets = array("I", offsets)
+        object.__setattr__(self, "text", text)
+        object.__setattr__(self, "codes", codes if isinstance(codes, bytes) else bytes(codes))
+        object.__setattr__(self, "offsets", memoryview(offsets).toreadonly())
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"Verbalization is immutable; cannot set {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"Verbalization is immutable; cannot delete {name!r}")
+
+    @classmethod
+    def from_marked(cls, marked: str) -> Verbalization:
+        # Offsets are counted without slicing the text; the plain text itself
+        # is one translate() plus a squash of the few spaces a removed mark
+        # left doubled.
+        codes = bytearray()
+        offsets = array("I")
+        length = 0
+        at_space = True
+
+        def advance(start: int, end: int) -> None:
+            nonlocal length, at_space
+            if start < end and at_space and marked[start] == " ":
+                start += 1
+            if start < end:
+                length += end - start
+                at_space = marked[end - 1] == " "
+
+        pos = 0
+        for match in re.finditer(_MARK_CLASS, marked):
+            advance(pos, match.start())
+            pos = match.end()
+            code = ord(match.group()) - _MARK_BASE
+            if code == 2 * _LETTER + 1:
+                length += 1
+                at_space = False
+            codes.append(code)
+            offsets.append(length)
+            if code == 2 * _LETTER:
+                length += 1
+                at_space = False
+        advance(pos, len(marked))
+        if at_space and length:
+            length -= 1
+            for idx, offset in enumerate(offsets):
+                if offset > length:
+                    offsets[idx] = length
+        text = _by_chunks(lambda piece: re.sub("  +", " ", piece.translate(_PLAIN_MARKS)), marked)
+        return cls(text.strip(), bytes(codes), offsets)
+
+    def events(self) -> Iterator[Tuple[str, bool, int]]:
+        for code, offset in zip(self.codes, self.offsets):
+            yield NODE_KINDS[code >> 1], bool(code & 1), offset
+
+    def to_json(self) -> str:
+        import json
+
+        return json.dumps({"text": self.text, "codes": list(self.codes), "offsets": list(self.offsets)})
+
+    @classmethod
+    def from_json(cls, data: str) -> Verbalization:
+        import json
+
+        payload = json.loads(data)
+        return cls(payload["text"], bytes(payload["codes"]), payload["offsets"])
+
+    def __reduce__(self) -> Tuple[type, Tuple[str, bytes, array]]:
+        return (Verbalization, (self.text, self.codes, self.offsets.obj))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Verbalization):
+            return NotImplemented
+        return self.text == other.text and self.codes == other.codes and self.offsets == other.offsets
+
+    def __hash__(self) -> int:
+        return hash((self.text, self.codes))
+
+    def __repr__(self) -> str:
+        return f"Verbalization({self.text!r}, {len(self.codes)} boundaries)"
+
+
+class Renderer:
+    """Walks a Verbalization; subclasses override the hooks they care about."""
+
+    def render(self, ir: Verbalization) -> str:
+        out: List[str] = []
+        text = ir.text
+        pos = 0
+        for kind, closing, offset in ir.events():
+            if kind == "letter" and closing:
+                out.append(self.letter(text[pos + 1 : offset - 1]))
+                pos = offset
                 continue
-            if tok.lower() in allowed_letters:
+            if offset > pos:
+                out.append(self.text(text[pos:offset]))
+            pos = offset
+            if kind == "letter":
                 continue
-            tokens[idx] = '"' + tok.lower() + '"'
-        else:
-            tokens[idx] = tok
-    text = " ".join(tokens)
+            out.append(self.close(kind) if closing else self.open(kind))
+        if pos < len(text):
+            out.append(self.text(text[pos:]))
+        return self.finish("".join(out))
+
+    def text(self, chunk: str) -> str:
+        return chunk
+
+    def open(self, kind: str) -> str:
+        return ""
+
+    def close(self, kind: str) -> str:
+        return ""
+
+    def letter(self, letter: str) -> str:
+        return '"' + letter + '"'
+
+    def finish(self, text: str) -> str:
+        return _squash(text).strip()
+
+
+class PlainRenderer(Renderer):
+    def render(self, ir: Verbalization) -> str:
+        return ir.text
+
+
+def _xml_escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
 
-    text = re.sub(r"[^A-Za-z\.\,\"\s]", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+
+class SSMLRenderer(Renderer):
+    _PITCH = {"superscript": "+10%", "subscript": "-10%"}
+
+    def text(self, chunk: str) -> str:
+        return _xml_escape(chunk)
+
+    def open(self, kind: str) -> str:
+        if kind in self._PITCH:
+            return f'<prosody pitch="{self._PITCH[kind]}">'
+        if kind in ("fraction", "root", "matrix"):
+            return '<break strength="weak"/>'
+        return ""
+
+    def close(self, kind: str) -> str:
+        if kind in self._PITCH:
+            return "</prosody>"
+        if kind in ("fraction", "root", "matrix"):
+            return '<break strength="weak"/>'
+        return ""
+
+    def letter(self, letter: str) -> str:
+        return f'<say-as interpret-as="characters">{_xml_escape(letter)}</say-as>'
+
+    def finish(self, text: str) -> str:
+        return "<speak>" + super().finish(text) + "</speak>"
+
+
+class ScreenReaderRenderer(Renderer):
+    _ENDINGS = {"fraction": "end fraction", "root": "end root", "matrix": "end matrix"}
+
+    def open(self, kind: str) -> str:
+        return " start fraction " if kind == "fraction" else ""
+
+    def close(self, kind: str) -> str:
+        ending = self._ENDINGS.get(kind)
+        return f" {ending} " if ending else ""
+
+    def letter(self, letter: str) -> str:
+        return letter
+
+
+RENDERERS: Dict[str, Renderer] = {
+    "plain": PlainRenderer(),
+    "ssml": SSMLRenderer(),
+    "screen-reader": ScreenReaderRenderer(),
+}
+
+
+def render(ir: Verbalization, renderer: Union[str, Renderer] = "plain") -> str:
+    if isinstance(renderer, str):
+        if renderer not in RENDERERS:
+            raise ValueError(f"unknown output format: {renderer}")
+        renderer = RENDERERS[renderer]
+    return renderer.render(ir)
+
+
+# ------------------------------ Coprocess mode ------------------------------
+
+# One long-lived process answering a stream of requests.  Each request is a
+# JSON object {"id": ..., "text": ..., "format": ..., "input": ...} (or just a
+# JSON string), framed either one per line or behind a 4-byte big-endian
+# length.  Requests run on a small thread pool, so responses carry the request
+# id and may come back out of order; every response is flushed as soon as it
+# is written.
+
+FRAMINGS = ("lines", "length")
+
+
+def _read_frames(stream: BinaryIO, framing: str) -> Iterator[bytes]:
+    import struct
+
+    if framing == "length":
+        while True:
+            header = stream.read(4)
+            if len(header) < 4:
+                return
+            (size,) = struct.unpack(">I", header)
+            payload = stream.read(size)
+            if len(payload) < size:
+                return
+            yield payload
+    else:
+        for line in iter(stream.readline, b""):
+            if line.strip():
+                yield line
+
+
+def _write_frame(stream: BinaryIO, payload: bytes, framing: str) -> None:
+    import struct
+
+    if framing == "length":
+        stream.write(struct.pack(">I", len(payload)) + payload)
+    else:
+        stream.write(payload + b"\n")
+    stream.flush()
+
+
+def _handle_request(
+    payload: bytes, default_format: str, default_input: str = "tex"
+) -> Dict[str, object]:
+    import json
+
+    try:
+        request = json.loads(payload)
+    except ValueError as exc:
+        return {"id": None, "error": f"invalid request: {exc}"}
+    if isinstance(request, str):
+        request = {"text": request}
+    if not isinstance(request, dict):
+        return {"id": None, "error": "request must be a JSON object or string"}
+    request_id = request.get("id")
+    if not isinstance(request.get("text"), str):
+        return {"id": request_id, "error": "request needs a text string"}
+    try:
+        ir = verbalize(request["text"], request.get("input", default_input))
+        output = render(ir, request.get("format", default_format))
+    except Exception as exc:
+        return {"id": request_id, "error": f"{type(exc).__name__}: {exc}"}
+    return {"id": request_id, "output": output}
+
+
+def serve(
+    stdin: BinaryIO,
+    stdout: BinaryIO,
+    framing: str = "lines",
+    workers: int = 4,
+    default_format: str = "plain",
+    default_input: str = "tex",
+) -> None:
+    import json
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    if framing not in FRAMINGS:
+        raise ValueError(f"unknown framing: {framing}")
+    warm()
+    lock = threading.Lock()
+
+    def respond(payload: bytes) -> None:
+        response = _handle_request(payload, default_format, default_input)
+        data = json.dumps(response, ensure_ascii=False).encode("utf-8")
+        with lock:
+            _write_frame(stdout, data, framing)
+
+    if workers <= 1:
+        for payload in _read_frames(stdin, framing):
+            respond(payload)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for payload in _read_frames(stdin, framing):
+            pool.submit(respond, payload)
 
 
 # ------------------------------ Command-line I/O ----------------------------
 
 
-def main() -> None:
-    if len(sys.argv) > 1:
-        source = " ".join(sys.argv[1:])
+def _parse_options(args: List[str]) -> Tuple[Dict[str, str], List[str]]:
+    # Options are only recognised before the text so that TeX such as "-x"
+    # still reaches the converter untouched; "--" ends option parsing.
+    options = {"format": "plain", "input": "tex", "serve": "", "workers": "4", "memory-report": ""}
+    flags = {"memory-report"}
+    while args and args[0].startswith("--"):
+        opt = args.pop(0)
+        if opt == "--":
+            break
+        name, sep, value = opt[2:].partition("=")
+        if name not in options:
+            args.insert(0, opt)
+            break
+        if name in flags:
+            value = value if sep else "1"
+        elif not sep:
+            if not args:
+                sys.exit(f"option --{name} needs a value")
+            value = args.pop(0)
+        options[name] = value
+    return options, args
+
+
+def _cli_verbalization(options: Dict[str, str], args: List[str]) -> Verbalization:
+    if args:
+        source = " ".join(args)
+    elif options["input"] == "mathml" and not options["memory-report"]:
+        # Parse MathML as it arrives instead of reading it all up front.
+        return verbalize_mathml(sys.stdin.buffer)
     else:
         source = sys.stdin.read()
-    output = convert_math_and_text(source)
+    if options["memory-report"]:
+        import json
+
+        # Render the document that was measured rather than converting it twice.
+        ir, report = _measured_verbalize(source, options["input"])
+        sys.stderr.write(json.dumps(report, indent=2) + "\n")
+        return ir
+    return verbalize(source, options["input"])
+
+
+def main() -> None:
+    options, args = _parse_options(sys.argv[1:])
+    if options["format"] not in RENDERERS:
+        sys.exit(f"unknown output format: {options['format']} (choose from {', '.join(RENDERERS)})")
+    if options["input"] not in INPUT_FORMATS:
+        choices = ", ".join(INPUT_FORMATS)
+        sys.exit(f"unknown input format: {options['input']} (choose from {choices})")
+    if options["serve"]:
+        if options["serve"] not in FRAMINGS:
+            sys.exit(f"unknown framing: {options['serve']} (choose from {', '.join(FRAMINGS)})")
+        if not options["workers"].isdigit():
+            sys.exit(f"--workers needs a number, got {options['workers']}")
+        serve(
+            sys.stdin.buffer,
+            sys.stdout.buffer,
+            options["serve"],
+            int(options["workers"]),
+            options["format"],
+            options["input"],
+        )
+        return
+    try:
+        ir = _cli_verbalization(options, args)
+    except SyntaxError as exc:
+        # ElementTree's ParseError, caught through its base class so that TeX
+        # input never has to import xml.etree.
+        sys.exit(f"invalid MathML: {exc}")
+    output = render(ir, options["format"])
     sys.stdout.write(output + ("\n" if not output.endswith("\n") else ""))
 
 
+if os.environ.get("TTS_CONVERTER_WARM", "").strip().lower() in {"1", "true", "yes", "on"}:
+    warm()
+
+
 if __name__ == "__main__":
     main()
 